@@ -2,131 +2,701 @@
 Core analyzer implementation using LLM-based complexity evaluation.
 """
 
+import ast
+import asyncio
+import io
+import json
 import os
-from typing import List, Optional, Dict
+import time
+from functools import cached_property, lru_cache
+from typing import Any, List, Optional, Dict, Tuple, Union
 from abc import ABC, abstractmethod
 import logging
 
+from anthropic import RateLimitError as AnthropicRateLimitError
+from openai import RateLimitError as OpenAIRateLimitError
+from pydantic import RootModel
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import SystemMessage
 
 from .models import FileComplexity, ComplexityReport
 from .github_client import GitHubAPIClient
 from .token_manager import TokenManager
+from .cache import AnalysisCache
+from .prefilter import inspect_file, build_trivial_stub
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ANALYSIS_SYSTEM_PROMPT = """You are an expert software architect analyzing code complexity.
+
+Evaluate the following code file across multiple dimensions:
+
+1. **Cyclomatic Complexity** (0-100): Control flow complexity based on decision points
+   - Count if/else, loops, switch statements
+   - Nested structures increase score exponentially
+
+2. **Architectural Complexity** (0-100): Design pattern sophistication
+   - Identify patterns: Factory, Strategy, Observer, Decorator, etc.
+   - Assess abstraction layers and dependency injection usage
+
+3. **Algorithmic Complexity** (0-100): Algorithm sophistication
+   - Analyze time/space complexity (O notation)
+   - Identify advanced algorithms (graph traversal, dynamic programming, etc.)
+
+Provide specific reasoning citing line numbers and code constructs.
+List all design patterns detected.
+Calculate total_score as weighted average: 30% cyclomatic, 40% architectural, 30% algorithmic.
+
+Be precise and evidence-based in your analysis."""
+
+# Bump whenever ANALYSIS_SYSTEM_PROMPT (or the scoring rubric it encodes)
+# changes, so cached results from the old prompt are invalidated
+PROMPT_VERSION = "1"
+
+
+class FileComplexityBatch(RootModel[List[FileComplexity]]):
+    """JSON-array payload returned by multi-file prompts."""
+
+
+# One chat model per (model, temperature): providers constructed with the
+# same configuration share the underlying httpx client, so its connection
+# pool (and TLS handshakes) are reused instead of rebuilt per instance
+@lru_cache(maxsize=8)
+def _build_chat_openai(model: str, temperature: float) -> ChatOpenAI:
+    """Shared ChatOpenAI client for a given configuration."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=os.getenv("OPENAI_API_KEY")
+    )
+
+
+@lru_cache(maxsize=8)
+def _build_chat_anthropic(model: str, temperature: float) -> ChatAnthropic:
+    """Shared ChatAnthropic client for a given configuration."""
+    return ChatAnthropic(
+        model=model,
+        temperature=temperature,
+        api_key=os.getenv("ANTHROPIC_API_KEY")
+    )
+
+
+_FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+class _DefBodyStripper(ast.NodeTransformer):
+    """Replace function bodies with their docstring plus ``...``."""
+
+    def _strip(self, node: _FunctionNode) -> _FunctionNode:
+        self.generic_visit(node)
+        doc = node.body[:1] if (
+            node.body
+            and isinstance(node.body[0], ast.Expr)
+            and isinstance(node.body[0].value, ast.Constant)
+            and isinstance(node.body[0].value.value, str)
+        ) else []
+        node.body = doc + [ast.Expr(value=ast.Constant(value=...))]
+        return node
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        return self._strip(node)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AST:
+        return self._strip(node)
+
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers implementing Strategy pattern."""
-    
+
+    # Concrete providers populate these in __init__; declaring them here
+    # lets the shared retry/cache/multi-file machinery type-check against
+    # the base class instead of duck-typing each subclass
+    model: str
+    temperature: float
+    cache: Optional[AnalysisCache]
+    llm: BaseChatModel
+    parser: PydanticOutputParser
+    _chain: Any
+
+    # Jittered exponential backoff on rate limits: async sleeps yield to
+    # the other in-flight analyses instead of blocking the fan-out
+    RETRY_ATTEMPTS = 5
+    RETRY_WAIT_INITIAL = 1.0
+    RETRY_WAIT_MAX = 30.0
+    _RETRYABLE_EXCEPTIONS = (OpenAIRateLimitError, AnthropicRateLimitError)
+
+    # Per-file prompt budget: keeps TTFT and prefill cost bounded no
+    # matter how large the source file is
+    MAX_FILE_TOKENS = 4096
+
     @abstractmethod
     def analyze_file(self, file_content: str, file_path: str) -> FileComplexity:
         """Analyze a single file for complexity."""
         pass
 
+    @abstractmethod
+    async def analyze_file_async(self, file_content: str, file_path: str) -> FileComplexity:
+        """Analyze a single file for complexity without blocking the event loop."""
+        pass
+
+    @abstractmethod
+    def analyze_files_batch(
+        self,
+        files: Dict[str, str],
+        poll_interval: float = 30.0,
+        timeout: float = 86400.0
+    ) -> List[FileComplexity]:
+        """Analyze many files via the provider's batch API."""
+        pass
+
+    @abstractmethod
+    def _chain_inputs(self, file_content: str, file_path: str) -> Dict:
+        """Build chain input variables for a single file."""
+        pass
+
+    @abstractmethod
+    def _get_system_prompt(self) -> str:
+        """System prompt for complexity analysis."""
+        pass
+
+    def _cache_key(self, file_content: str) -> str:
+        """Content-addressed cache key for this provider configuration."""
+        return AnalysisCache.make_key(
+            self.model, self.temperature, file_content, PROMPT_VERSION
+        )
+
+    def _cache_lookup(self, file_content: str) -> Optional[FileComplexity]:
+        """Return a cached result for this content, or None on miss."""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(file_content))
+        if cached is None:
+            return None
+        return FileComplexity.model_validate_json(cached)
+
+    def _cache_store(self, file_content: str, result: FileComplexity) -> None:
+        """Persist a result for this content."""
+        if self.cache is not None:
+            self.cache.set(self._cache_key(file_content), result.model_dump_json())
+
+    def _partition_cached(
+        self,
+        files: Dict[str, str]
+    ) -> Tuple[List[FileComplexity], Dict[str, str]]:
+        """Split files into cached results and the misses still to analyze."""
+        hits: List[FileComplexity] = []
+        misses: Dict[str, str] = {}
+        for file_path, file_content in files.items():
+            cached = self._cache_lookup(file_content)
+            if cached is not None:
+                hits.append(cached)
+            else:
+                misses[file_path] = file_content
+        return hits, misses
+
+    @cached_property
+    def _token_manager(self) -> TokenManager:
+        """Token counter for this provider's model, built on first use."""
+        return TokenManager(model=self.model)
+
+    def _truncate_for_llm(self, content: str, path: str) -> str:
+        """
+        Fit file content into the per-file token budget.
+
+        Small files pass through untouched (a BPE token is at least one
+        character, so the length check avoids encoding entirely).
+        Oversized Python files degrade to a signatures-plus-docstrings
+        skeleton — far more informative for architectural scoring than a
+        blind prefix — and anything still over budget is cut at the token
+        boundary.
+        """
+        if len(content) <= self.MAX_FILE_TOKENS:
+            return content
+        if self._token_manager.count_tokens(content) <= self.MAX_FILE_TOKENS:
+            return content
+
+        if path.endswith(".py"):
+            try:
+                skeleton = ast.unparse(
+                    _DefBodyStripper().visit(ast.parse(content))
+                )
+            except (SyntaxError, ValueError):
+                pass
+            else:
+                logger.info(
+                    f"{path} exceeds {self.MAX_FILE_TOKENS} tokens; "
+                    f"sending signature skeleton"
+                )
+                content = skeleton
+
+        return self._token_manager.truncate_to_limit(
+            content, max_tokens=self.MAX_FILE_TOKENS, buffer=0
+        )
+
+    async def _ainvoke_with_retry(self, inputs: Dict) -> FileComplexity:
+        """Invoke the chain, retrying rate limits with jittered backoff."""
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.RETRY_ATTEMPTS),
+            wait=wait_exponential_jitter(
+                initial=self.RETRY_WAIT_INITIAL, max=self.RETRY_WAIT_MAX
+            ),
+            retry=retry_if_exception_type(self._RETRYABLE_EXCEPTIONS),
+            reraise=True
+        ):
+            with attempt:
+                result = await self._chain.ainvoke(inputs)
+        return result
+
+    @cached_property
+    def _multi_parser(self) -> PydanticOutputParser:
+        """Parser for the JSON-array payload of multi-file prompts."""
+        return PydanticOutputParser(pydantic_object=FileComplexityBatch)
+
+    @cached_property
+    def _multi_format_instructions(self) -> str:
+        """Format instructions for multi-file prompts, serialized once."""
+        return self._multi_parser.get_format_instructions()
+
+    @cached_property
+    def _multi_chain(self) -> Any:
+        """Prompt -> LLM -> list parser chain for packed multi-file calls."""
+        prompt = ChatPromptTemplate.from_messages([
+            (
+                "system",
+                self._get_system_prompt()
+                + "\n\nYou will receive several files in one message. "
+                  "Analyze each file independently and return a JSON array "
+                  "with exactly one entry per file, in the same order."
+            ),
+            ("human", "{files_block}\n\n{format_instructions}")
+        ])
+        return prompt | self.llm | self._multi_parser
+
+    def analyze_files_multi(
+        self,
+        files: List[Tuple[str, str]]
+    ) -> List[FileComplexity]:
+        """
+        Analyze several files in a single LLM call.
+
+        Packing K files behind one system prompt amortizes the
+        instruction/schema tokens and one network round-trip across all
+        of them. If the model returns an unparsable or wrong-length
+        array, the batch splits in half and retries; a single file that
+        still fails falls back to the structured per-file call.
+
+        Args:
+            files: List of (file_path, file_content) pairs
+
+        Returns:
+            List of FileComplexity results, one per file
+        """
+        if not files:
+            return []
+
+        blocks = []
+        for i, (file_path, file_content) in enumerate(files, 1):
+            inputs = self._chain_inputs(file_content, file_path)
+            blocks.append(
+                f"### FILE {i}: {inputs['file_path']}\n"
+                f"```\n{inputs['file_content']}\n```"
+            )
+
+        try:
+            batch = self._multi_chain.invoke({
+                "files_block": "\n\n".join(blocks),
+                "format_instructions": self._multi_format_instructions
+            })
+            results = batch.root
+            if len(results) != len(files):
+                raise ValueError(
+                    f"Expected {len(files)} results, got {len(results)}"
+                )
+            return results
+        except Exception as e:
+            if len(files) == 1:
+                file_path, file_content = files[0]
+                logger.warning(
+                    f"Multi-file call failed for {file_path} ({e}); "
+                    f"falling back to per-file analysis"
+                )
+                return [self.analyze_file(file_content, file_path)]
+            mid = len(files) // 2
+            logger.warning(
+                f"Multi-file batch of {len(files)} failed ({e}); splitting"
+            )
+            # Retry each half independently so a failure in one half
+            # cannot discard results already recovered from the other
+            results = []
+            for half in (files[:mid], files[mid:]):
+                try:
+                    results.extend(self.analyze_files_multi(half))
+                except Exception as half_error:
+                    logger.warning(
+                        f"✗ Dropping {len(half)} files after split "
+                        f"retry failed: {half_error}"
+                    )
+            return results
+
 
 class OpenAIProvider(LLMProvider):
     """OpenAI GPT provider for complexity analysis (default via OPENAI_MODEL)."""
-    
-    def __init__(self, model: str = "gpt-4-turbo-preview", temperature: float = 0.1):
-        chosen_model = model or os.getenv("OPENAI_MODEL", "gpt-5")
-        self.llm = ChatOpenAI(
-            model=chosen_model,
-            temperature=temperature,
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+
+    llm: ChatOpenAI
+
+    def __init__(
+        self,
+        model: str = "gpt-4-turbo-preview",
+        temperature: float = 0.1,
+        cache: Optional[AnalysisCache] = None
+    ):
+        self.model = model or os.getenv("OPENAI_MODEL", "gpt-5")
+        self.temperature = temperature
+        self.cache = cache
+        self.llm = _build_chat_openai(self.model, temperature)
         self.parser = PydanticOutputParser(pydantic_object=FileComplexity)
-        
+        # Schema introspection is not free; serialize it once per provider
+        self._format_instructions = self.parser.get_format_instructions()
+        # Native structured output enforces the schema in the decoder,
+        # replacing hundreds of format-instruction prompt tokens and the
+        # parse-retry loop (the parser is kept for the Batch API path)
+        self._structured_llm = self.llm.with_structured_output(
+            FileComplexity, method="json_schema", strict=True
+        )
+        # Template parsing and runnable validation happen once, not per file
+        self._chain = self._build_chain()
+
     def analyze_file(self, file_content: str, file_path: str) -> FileComplexity:
         """Analyze file using GPT-4."""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", self._get_system_prompt()),
-            ("human", "File: {file_path}\n\nContent:\n{file_content}\n\n{format_instructions}")
-        ])
-        
-        chain = prompt | self.llm | self.parser
-        
+        cached = self._cache_lookup(file_content)
+        if cached is not None:
+            return cached
+
         try:
-            result = chain.invoke({
-                "file_path": file_path,
-                "file_content": file_content[:15000],  # Prevent token overflow
-                "format_instructions": self.parser.get_format_instructions()
-            })
+            result = self._chain.invoke(self._chain_inputs(file_content, file_path))
+            self._cache_store(file_content, result)
             return result
         except Exception as e:
             logger.error(f"Error analyzing {file_path}: {e}")
             raise
-    
-    def _get_system_prompt(self) -> str:
-        """System prompt for complexity analysis."""
-        return """You are an expert software architect analyzing code complexity.
 
-Evaluate the following code file across multiple dimensions:
+    async def analyze_file_async(self, file_content: str, file_path: str) -> FileComplexity:
+        """Analyze file using GPT-4 asynchronously."""
+        cached = self._cache_lookup(file_content)
+        if cached is not None:
+            return cached
 
-1. **Cyclomatic Complexity** (0-100): Control flow complexity based on decision points
-   - Count if/else, loops, switch statements
-   - Nested structures increase score exponentially
-   
-2. **Architectural Complexity** (0-100): Design pattern sophistication
-   - Identify patterns: Factory, Strategy, Observer, Decorator, etc.
-   - Assess abstraction layers and dependency injection usage
-   
-3. **Algorithmic Complexity** (0-100): Algorithm sophistication
-   - Analyze time/space complexity (O notation)
-   - Identify advanced algorithms (graph traversal, dynamic programming, etc.)
+        try:
+            result = await self._ainvoke_with_retry(self._chain_inputs(file_content, file_path))
+            self._cache_store(file_content, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error analyzing {file_path}: {e}")
+            raise
 
-Provide specific reasoning citing line numbers and code constructs.
-List all design patterns detected.
-Calculate total_score as weighted average: 30% cyclomatic, 40% architectural, 30% algorithmic.
+    def _build_chain(self) -> Any:
+        """Build the prompt -> structured LLM chain."""
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", self._get_system_prompt()),
+            ("human", "File: {file_path}\n\nContent:\n{file_content}")
+        ])
+        return prompt | self._structured_llm
 
-Be precise and evidence-based in your analysis."""
+    def analyze_files_batch(
+        self,
+        files: Dict[str, str],
+        poll_interval: float = 30.0,
+        timeout: float = 86400.0
+    ) -> List[FileComplexity]:
+        """
+        Analyze many files via the OpenAI Batch API.
+
+        Submits all prompts as a single batch (50% token discount,
+        server-side parallel scheduling), polls until completion and
+        parses results. Intended for bulk scans where latency is not
+        interactive-critical.
+
+        Args:
+            files: Mapping of file path to file content
+            poll_interval: Seconds between status polls
+            timeout: Give up after this many seconds
+
+        Returns:
+            List of FileComplexity results (failed files are skipped)
+        """
+        # Serve cache hits locally; only misses pay for batch submission
+        results, misses = self._partition_cached(files)
+        if not misses:
+            return results
+
+        client = self.llm.root_client
+
+        # One JSONL request line per file, keyed by path for result matching
+        lines = []
+        for file_path, file_content in misses.items():
+            inputs = self._chain_inputs(file_content, file_path)
+            body = {
+                "model": self.llm.model_name,
+                "temperature": self.llm.temperature,
+                "messages": [
+                    {"role": "system", "content": self._get_system_prompt()},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"File: {inputs['file_path']}\n\n"
+                            f"Content:\n{inputs['file_content']}\n\n"
+                            f"{inputs['format_instructions']}"
+                        )
+                    },
+                ],
+            }
+            lines.append(json.dumps({
+                "custom_id": file_path,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }))
+
+        input_file = client.files.create(
+            file=io.BytesIO("\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(misses)} files")
+
+        deadline = time.monotonic() + timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch.id} did not complete within {timeout}s")
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+        output = client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            file_path = record.get("custom_id", "<unknown>")
+            try:
+                content = record["response"]["body"]["choices"][0]["message"]["content"]
+                parsed = self.parser.parse(content)
+            except Exception as e:
+                logger.warning(f"✗ Failed to parse batch result for {file_path}: {e}")
+                continue
+            if file_path in misses:
+                self._cache_store(misses[file_path], parsed)
+            results.append(parsed)
+
+        return results
+
+    def _chain_inputs(self, file_content: str, file_path: str) -> Dict:
+        """Build chain input variables for a single file."""
+        return {
+            "file_path": file_path,
+            "file_content": self._truncate_for_llm(file_content, file_path),
+            "format_instructions": self._format_instructions
+        }
+    
+    def _get_system_prompt(self) -> str:
+        """System prompt for complexity analysis."""
+        return ANALYSIS_SYSTEM_PROMPT
 
 
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude provider for complexity analysis."""
-    
-    def __init__(self, model: str = "claude-3-opus-20240229", temperature: float = 0.1):
-        self.llm = ChatAnthropic(
-            model=model,
-            temperature=temperature,
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
+
+    llm: ChatAnthropic
+
+    def __init__(
+        self,
+        model: str = "claude-3-opus-20240229",
+        temperature: float = 0.1,
+        cache: Optional[AnalysisCache] = None
+    ):
+        self.model = model
+        self.temperature = temperature
+        self.cache = cache
+        self.llm = _build_chat_anthropic(model, temperature)
         self.parser = PydanticOutputParser(pydantic_object=FileComplexity)
-        
+        # Schema introspection is not free; serialize it once per provider
+        self._format_instructions = self.parser.get_format_instructions()
+        # Schema travels as a tool definition (Anthropic tool-use) instead
+        # of format-instruction prompt tokens
+        self._structured_llm = self.llm.with_structured_output(FileComplexity)
+        # Template parsing and runnable validation happen once, not per file
+        self._chain = self._build_chain()
+
     def analyze_file(self, file_content: str, file_path: str) -> FileComplexity:
         """Analyze file using Claude."""
-        # Similar implementation to OpenAI but optimized for Claude's context window
-        prompt = ChatPromptTemplate.from_messages([
-            ("human", self._get_analysis_prompt(file_path, file_content))
-        ])
-        
-        chain = prompt | self.llm | self.parser
-        
+        cached = self._cache_lookup(file_content)
+        if cached is not None:
+            return cached
+
         try:
-            result = chain.invoke({
-                "format_instructions": self.parser.get_format_instructions()
-            })
+            result = self._chain.invoke(self._chain_inputs(file_content, file_path))
+            self._cache_store(file_content, result)
             return result
         except Exception as e:
             logger.error(f"Error analyzing {file_path}: {e}")
             raise
-    
-    def _get_analysis_prompt(self, file_path: str, file_content: str) -> str:
-        """Construct analysis prompt for Claude."""
-        return f"""Analyze this code file for complexity across multiple dimensions.
 
-File: {file_path}
+    async def analyze_file_async(self, file_content: str, file_path: str) -> FileComplexity:
+        """Analyze file using Claude asynchronously."""
+        cached = self._cache_lookup(file_content)
+        if cached is not None:
+            return cached
+
+        try:
+            result = await self._ainvoke_with_retry(self._chain_inputs(file_content, file_path))
+            self._cache_store(file_content, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error analyzing {file_path}: {e}")
+            raise
+
+    def _build_chain(self) -> Any:
+        """Build the prompt -> structured LLM chain."""
+        # The static scoring instructions go in a cache_control block so
+        # repeated analyses within the cache window pay ~10% of the
+        # input-token cost on the prefix instead of full price
+        prompt = ChatPromptTemplate.from_messages([
+            self._system_message(),
+            ("human", "File: {file_path}\n\nContent:\n{file_content}")
+        ])
+        return prompt | self._structured_llm
+
+    def _system_message(self) -> SystemMessage:
+        """Static system prompt as an ephemeral cache block."""
+        return SystemMessage(content=[
+            {
+                "type": "text",
+                "text": self._get_system_prompt(),
+                "cache_control": {"type": "ephemeral"}
+            },
+        ])
+
+    def _get_system_prompt(self) -> str:
+        """System prompt for complexity analysis."""
+        return ANALYSIS_SYSTEM_PROMPT
+
+    def _chain_inputs(self, file_content: str, file_path: str) -> Dict:
+        """Build chain input variables for a single file."""
+        return {
+            "file_path": file_path,
+            "file_content": self._truncate_for_llm(file_content, file_path)
+        }
+
+    def analyze_files_batch(
+        self,
+        files: Dict[str, str],
+        poll_interval: float = 30.0,
+        timeout: float = 86400.0
+    ) -> List[FileComplexity]:
+        """
+        Analyze many files via the Anthropic Message Batches API.
+
+        Submits all prompts as a single batch (50% token discount,
+        server-side parallel scheduling), polls until processing ends and
+        parses results. Intended for bulk scans where latency is not
+        interactive-critical.
+
+        Args:
+            files: Mapping of file path to file content
+            poll_interval: Seconds between status polls
+            timeout: Give up after this many seconds
+
+        Returns:
+            List of FileComplexity results (failed files are skipped)
+        """
+        # Serve cache hits locally; only misses pay for batch submission
+        results, misses = self._partition_cached(files)
+        if not misses:
+            return results
+
+        client = self.llm._client
+
+        # custom_id is restricted to [a-zA-Z0-9_-], so requests are keyed
+        # by index and paths kept locally for logging
+        paths = list(misses)
+        requests = []
+        for i, (file_path, file_content) in enumerate(misses.items()):
+            inputs = self._chain_inputs(file_content, file_path)
+            requests.append({
+                "custom_id": f"file-{i}",
+                "params": {
+                    "model": self.model,
+                    "max_tokens": self.llm.max_tokens,
+                    "temperature": self.temperature,
+                    "system": [
+                        {
+                            "type": "text",
+                            "text": self._get_system_prompt(),
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                    ],
+                    "messages": [{
+                        "role": "user",
+                        "content": (
+                            f"File: {inputs['file_path']}\n\n"
+                            f"Content:\n{inputs['file_content']}\n\n"
+                            f"{self._format_instructions}"
+                        )
+                    }],
+                },
+            })
+
+        batch = client.messages.batches.create(requests=requests)
+        logger.info(f"Submitted message batch {batch.id} with {len(misses)} files")
 
-Content:
-{file_content[:20000]}
+        deadline = time.monotonic() + timeout
+        while batch.processing_status != "ended":
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch.id} did not complete within {timeout}s")
+            time.sleep(poll_interval)
+            batch = client.messages.batches.retrieve(batch.id)
 
-{self.parser.get_format_instructions()}
+        for entry in client.messages.batches.results(batch.id):
+            index = int(entry.custom_id.rsplit("-", 1)[1])
+            file_path = paths[index] if index < len(paths) else entry.custom_id
+            if entry.result.type != "succeeded":
+                logger.warning(
+                    f"✗ Batch request for {file_path} ended as {entry.result.type}"
+                )
+                continue
+            try:
+                text = "".join(
+                    getattr(block, "text", "")
+                    for block in entry.result.message.content
+                    if getattr(block, "type", None) == "text"
+                )
+                parsed = self.parser.parse(text)
+            except Exception as e:
+                logger.warning(f"✗ Failed to parse batch result for {file_path}: {e}")
+                continue
+            if file_path in misses:
+                self._cache_store(misses[file_path], parsed)
+            results.append(parsed)
 
-Provide detailed complexity analysis with evidence-based reasoning."""
+        return results
 
 
 class RepositoryAnalyzer:
@@ -141,71 +711,381 @@ class RepositoryAnalyzer:
         model: Optional[str] = None,
         max_files: int = 50,
         exclude_patterns: Optional[List[str]] = None,
-        complexity_weights: Optional[Dict[str, float]] = None
+        complexity_weights: Optional[Dict[str, float]] = None,
+        max_concurrency: int = 10,
+        batch_threshold: Optional[int] = 20,
+        compression_ratio: Optional[float] = None,
+        cache: Optional[AnalysisCache] = None,
+        prefilter: bool = True,
+        max_chunk_tokens: int = 4000,
+        multi_file_tokens: Optional[int] = None
     ):
         """
         Initialize the analyzer.
-        
+
         Args:
             llm_provider: "openai" or "anthropic"
             model: Specific model name (defaults to provider's best model)
             max_files: Maximum number of files to analyze
             exclude_patterns: Glob patterns for files to skip
             complexity_weights: Custom weights for complexity components
+            max_concurrency: Maximum number of in-flight LLM requests
+            batch_threshold: Route scans of at least this many files through
+                the provider's Batch API (50% cost); None disables batch
+                routing
+            compression_ratio: Target fraction of tokens to keep when
+                compressing file contents with LLMLingua-2 before the LLM
+                call; None disables compression (requires the
+                ``compression`` extra)
+            cache: AnalysisCache for reusing results of unchanged files
+                across runs; None disables caching
+            prefilter: Short-circuit trivially simple files with a cheap
+                AST pre-pass instead of an LLM call
+            max_chunk_tokens: Files above this token count are analyzed
+                chunk-wise (map-reduce) instead of being truncated
+            multi_file_tokens: Pack several files into each LLM call,
+                greedily bin-packed up to this many content tokens per
+                call, so the instruction tokens are paid once per bin;
+                None keeps one file per call
         """
         self.github_client = GitHubAPIClient()
         self.token_manager = TokenManager()
         self.max_files = max_files
         self.exclude_patterns = exclude_patterns or ["tests/*", "*.md", "*.txt"]
+        self.max_concurrency = max_concurrency
+        self.batch_threshold = batch_threshold
+        self.prefilter = prefilter
+        self.max_chunk_tokens = max_chunk_tokens
+        self.multi_file_tokens = multi_file_tokens
+        self.compression_ratio = compression_ratio
+        if compression_ratio is not None:
+            from .compression import PromptCompressor
+            self.compressor: Optional[PromptCompressor] = PromptCompressor()
+        else:
+            self.compressor = None
         
         # Factory pattern for LLM provider selection
-        self.llm_provider = self._create_llm_provider(llm_provider, model)
-        
-    def _create_llm_provider(self, provider: str, model: Optional[str]) -> LLMProvider:
+        self.llm_provider = self._create_llm_provider(llm_provider, model, cache)
+
+    def _create_llm_provider(
+        self,
+        provider: str,
+        model: Optional[str],
+        cache: Optional[AnalysisCache] = None
+    ) -> LLMProvider:
         """Factory method for creating LLM providers."""
         if provider == "openai":
-            return OpenAIProvider(model=model or os.getenv("OPENAI_MODEL", "gpt-5"))
+            return OpenAIProvider(
+                model=model or os.getenv("OPENAI_MODEL", "gpt-5"),
+                cache=cache
+            )
         elif provider == "anthropic":
-            return AnthropicProvider(model=model or "claude-3-opus-20240229")
+            return AnthropicProvider(
+                model=model or "claude-3-opus-20240229",
+                cache=cache
+            )
         else:
             raise ValueError(f"Unknown provider: {provider}")
     
     def analyze(self, repository_url: str) -> ComplexityReport:
         """
         Analyze a GitHub repository for code complexity.
-        
+
+        Synchronous wrapper around :meth:`analyze_async` for CLI and
+        library callers without an event loop.
+
         Args:
             repository_url: Full GitHub repository URL
-            
+
+        Returns:
+            ComplexityReport with detailed analysis
+        """
+        return asyncio.run(self.analyze_async(repository_url))
+
+    async def analyze_async(self, repository_url: str) -> ComplexityReport:
+        """
+        Analyze a GitHub repository for code complexity.
+
+        Per-file LLM calls are dispatched concurrently (bounded by
+        ``max_concurrency``) so network round-trips overlap instead of
+        serializing.
+
+        Args:
+            repository_url: Full GitHub repository URL
+
         Returns:
             ComplexityReport with detailed analysis
         """
         logger.info(f"Starting analysis of {repository_url}")
-        
+
         # Fetch repository files
-        files = self.github_client.fetch_repository_files(
+        files = await self.github_client.fetch_repository_files_async(
             repository_url,
             max_files=self.max_files,
             exclude_patterns=self.exclude_patterns
         )
-        
+
         logger.info(f"Analyzing {len(files)} files")
-        
-        # Analyze each file
+
+        # Short-circuit trivially simple files with a deterministic
+        # AST pre-pass; only the rest pay for an LLM call
         analyzed_files: List[FileComplexity] = []
-        for file_path, file_content in files.items():
+        llm_files = files
+        if self.prefilter:
+            llm_files = {}
+            for file_path, file_content in files.items():
+                stats = inspect_file(file_path, file_content)
+                if stats.is_trivial:
+                    analyzed_files.append(build_trivial_stub(file_path, stats))
+                else:
+                    llm_files[file_path] = file_content
+            if analyzed_files:
+                logger.info(
+                    f"Prefilter short-circuited {len(analyzed_files)} trivial files"
+                )
+
+        if self._use_batch_api(llm_files):
             try:
-                complexity = self.llm_provider.analyze_file(file_content, file_path)
-                analyzed_files.append(complexity)
-                logger.info(f"✓ {file_path}: {complexity.total_score:.1f}/100")
+                # Batch jobs poll with blocking sleeps; keep the loop responsive
+                analyzed_files.extend(await asyncio.to_thread(
+                    self.llm_provider.analyze_files_batch, llm_files
+                ))
             except Exception as e:
-                logger.warning(f"✗ Failed to analyze {file_path}: {e}")
+                # A failed or timed-out batch job should not abort the
+                # scan; degrade to the concurrent per-file path instead
+                logger.warning(
+                    f"Batch API failed ({e}); falling back to per-file analysis"
+                )
+            else:
+                return self._build_report(repository_url, files, analyzed_files)
+
+        if self.multi_file_tokens is not None:
+            analyzed_files.extend(await self._analyze_multi(llm_files))
+            return self._build_report(repository_url, files, analyzed_files)
+
+        # Fan out file analyses, bounded by a semaphore so we stay under
+        # provider rate limits
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def analyze_one(file_path: str, file_content: str) -> FileComplexity:
+            async with semaphore:
+                if self.compressor is not None:
+                    # Compression is CPU-bound; keep it off the event loop
+                    file_content = await asyncio.to_thread(
+                        self.compressor.compress, file_content, self.compression_ratio
+                    )
+                return await self._analyze_file_maybe_chunked(file_path, file_content)
+
+        results = await asyncio.gather(
+            *(analyze_one(path, content) for path, content in llm_files.items()),
+            return_exceptions=True
+        )
+
+        for file_path, result in zip(llm_files, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"✗ Failed to analyze {file_path}: {result}")
                 continue
-        
-        # Determine top file and overall score
-        top_file = max(analyzed_files, key=lambda x: x.total_score)
-        avg_score = sum(f.total_score for f in analyzed_files) / len(analyzed_files)
-        
+            analyzed_files.append(result)
+            logger.info(f"✓ {file_path}: {result.total_score:.1f}/100")
+
+        return self._build_report(repository_url, files, analyzed_files)
+
+    async def _analyze_multi(self, files: Dict[str, str]) -> List[FileComplexity]:
+        """Analyze files packed several-per-call, bins dispatched concurrently."""
+        bins = self._bin_pack(files, self.multi_file_tokens)
+        results = await asyncio.gather(
+            *(
+                asyncio.to_thread(self.llm_provider.analyze_files_multi, group)
+                for group in bins
+            ),
+            return_exceptions=True
+        )
+
+        analyzed: List[FileComplexity] = []
+        for group, result in zip(bins, results):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    f"✗ Failed to analyze bin of {len(group)} files: {result}"
+                )
+                continue
+            analyzed.extend(result)
+        return analyzed
+
+    def _bin_pack(
+        self,
+        files: Dict[str, str],
+        max_tokens: int
+    ) -> List[List[Tuple[str, str]]]:
+        """Greedy first-fit packing of files into per-call token bins."""
+        paths = list(files)
+        counts = self.token_manager.count_tokens_batch([files[p] for p in paths])
+
+        bins: List[List[Tuple[str, str]]] = []
+        current: List[Tuple[str, str]] = []
+        current_tokens = 0
+
+        for path, tokens in zip(paths, counts):
+            if current and current_tokens + tokens > max_tokens:
+                bins.append(current)
+                current = []
+                current_tokens = 0
+            current.append((path, files[path]))
+            current_tokens += tokens
+
+        if current:
+            bins.append(current)
+
+        return bins
+
+    async def _analyze_file_maybe_chunked(
+        self,
+        file_path: str,
+        file_content: str
+    ) -> FileComplexity:
+        """
+        Analyze a file, splitting it map-reduce style when it exceeds
+        the per-call token budget instead of truncating away its tail.
+        """
+        if not self._needs_chunking(file_content):
+            return await self.llm_provider.analyze_file_async(file_content, file_path)
+
+        chunks = self._chunk_file(file_path, file_content)
+        if len(chunks) <= 1:
+            return await self.llm_provider.analyze_file_async(file_content, file_path)
+
+        logger.info(f"Analyzing {file_path} in {len(chunks)} chunks")
+        results = await asyncio.gather(*(
+            self.llm_provider.analyze_file_async(
+                chunk, f"{file_path} (part {i + 1}/{len(chunks)})"
+            )
+            for i, chunk in enumerate(chunks)
+        ))
+        return self._merge_chunk_results(file_path, chunks, results)
+
+    def _needs_chunking(self, file_content: str) -> bool:
+        """Check the token budget, skipping encoding for small files."""
+        # A token is at least one character, so short texts can never
+        # exceed the budget
+        if len(file_content) <= self.max_chunk_tokens:
+            return False
+        return self.token_manager.count_tokens(file_content) > self.max_chunk_tokens
+
+    def _chunk_file(self, file_path: str, file_content: str) -> List[str]:
+        """
+        Split file content into chunks of at most max_chunk_tokens,
+        preferring breaks at top-level function/class boundaries for
+        Python files so no chunk starts mid-definition.
+        """
+        lines = file_content.splitlines(keepends=True)
+        counts = self.token_manager.count_tokens_batch(lines)
+        boundaries = self._definition_boundaries(file_path, file_content)
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for i, (line, tokens) in enumerate(zip(lines, counts)):
+            over_budget = current and current_tokens + tokens > self.max_chunk_tokens
+            # Close early at a definition boundary once a chunk is
+            # reasonably full, so definitions stay intact
+            at_boundary = (
+                current
+                and i in boundaries
+                and current_tokens >= self.max_chunk_tokens * 0.75
+            )
+            if over_budget or at_boundary:
+                chunks.append("".join(current))
+                current = []
+                current_tokens = 0
+            current.append(line)
+            current_tokens += tokens
+
+        if current:
+            chunks.append("".join(current))
+
+        return chunks
+
+    @staticmethod
+    def _definition_boundaries(file_path: str, file_content: str) -> set:
+        """Line indices starting a top-level def/class (Python only)."""
+        if not file_path.endswith(".py"):
+            return set()
+        try:
+            tree = ast.parse(file_content)
+        except SyntaxError:
+            return set()
+        return {
+            node.lineno - 1
+            for node in tree.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        }
+
+    def _merge_chunk_results(
+        self,
+        file_path: str,
+        chunks: List[str],
+        results: List[FileComplexity]
+    ) -> FileComplexity:
+        """
+        Reduce per-chunk scores into one FileComplexity.
+
+        Cyclomatic and algorithmic scores average weighted by chunk
+        size; architectural score takes the max, since design patterns
+        are file-wide properties; detected patterns union.
+        """
+        weights = [max(len(chunk.splitlines()), 1) for chunk in chunks]
+        total_weight = sum(weights)
+
+        def weighted_mean(values: List[float]) -> float:
+            return sum(v * w for v, w in zip(values, weights)) / total_weight
+
+        cyclomatic = weighted_mean([r.cyclomatic_score for r in results])
+        algorithmic = weighted_mean([r.algorithmic_score for r in results])
+        architectural = max(r.architectural_score for r in results)
+        total = 0.3 * cyclomatic + 0.4 * architectural + 0.3 * algorithmic
+
+        patterns = tuple(sorted(set().union(*(r.patterns_detected for r in results))))
+        top_chunk = max(results, key=lambda r: r.total_score)
+
+        return FileComplexity(
+            file_path=file_path,
+            total_score=round(total, 2),
+            cyclomatic_score=round(cyclomatic, 2),
+            architectural_score=round(architectural, 2),
+            algorithmic_score=round(algorithmic, 2),
+            line_count=sum(r.line_count for r in results),
+            function_count=sum(r.function_count for r in results),
+            class_count=sum(r.class_count for r in results),
+            patterns_detected=patterns,
+            reasoning=(
+                f"Merged from {len(chunks)} chunk analyses (map-reduce). "
+                f"Most complex chunk: {top_chunk.reasoning}"
+            )
+        )
+
+    def _use_batch_api(self, files: Dict[str, str]) -> bool:
+        """Whether this scan should go through the provider's Batch API."""
+        return (
+            self.batch_threshold is not None
+            and len(files) >= self.batch_threshold
+        )
+
+    def _build_report(
+        self,
+        repository_url: str,
+        files: Dict[str, str],
+        analyzed_files: List[FileComplexity]
+    ) -> ComplexityReport:
+        """Assemble the final report from per-file results."""
+        # Determine top file and overall score in a single pass
+        top_file = analyzed_files[0]
+        score_sum = 0.0
+        for complexity in analyzed_files:
+            score_sum += complexity.total_score
+            if complexity.total_score > top_file.total_score:
+                top_file = complexity
+        avg_score = score_sum / len(analyzed_files)
+
         return ComplexityReport(
             repository_url=repository_url,
             analyzed_files=analyzed_files,
@@ -218,7 +1098,7 @@ class RepositoryAnalyzer:
             },
             timestamp=self._get_timestamp()
         )
-    
+
     def _get_timestamp(self) -> str:
         """Get ISO format timestamp."""
         from datetime import datetime
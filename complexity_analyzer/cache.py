@@ -0,0 +1,106 @@
+"""
+Content-addressed caching of LLM analysis results.
+"""
+
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    Two-tier cache for serialized FileComplexity results: an in-process
+    LRU in front of a SQLite table that persists across invocations.
+
+    Keys are content-addressed over (model, temperature, prompt version,
+    file content), so re-analyzing unchanged files returns in
+    microseconds instead of paying for an LLM round-trip.
+    """
+
+    DEFAULT_PATH = ".complexity_cache.db"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        ttl: float = 7 * 24 * 3600,
+        memory_size: int = 1024
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file (":memory:" for in-process only)
+            ttl: Seconds before a persisted entry expires
+            memory_size: Maximum entries held in the in-process LRU tier
+        """
+        self.ttl = ttl
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_size = memory_size
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        temperature: float,
+        file_content: str,
+        prompt_version: str = "1"
+    ) -> str:
+        """
+        Build a content-addressed cache key.
+
+        prompt_version must be bumped whenever the analysis prompt
+        changes, so stale results from an older prompt are never reused.
+        """
+        payload = f"{model}|{temperature}|{prompt_version}|{file_content}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on miss/expiry."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        row = self._conn.execute(
+            "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at = row
+        if time.time() - created_at > self.ttl:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+
+        self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value under key in both tiers."""
+        self._remember(key, value)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+            (key, value, time.time())
+        )
+        self._conn.commit()
+
+    def _remember(self, key: str, value: str) -> None:
+        """Insert into the LRU tier, evicting the oldest entry if full."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+        self._conn.close()
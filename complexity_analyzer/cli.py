@@ -115,12 +115,9 @@ def _display_report(report: ComplexityReport):
     # Top 5 most complex files
     console.print("\n[bold]Top 5 Most Complex Files:[/bold]\n")
     
-    sorted_files = sorted(
-        report.analyzed_files,
-        key=lambda x: x.total_score,
-        reverse=True
-    )[:5]
-    
+    # Vectorized partial selection instead of sorting every analyzed file
+    sorted_files = report.top_k(5)
+
     files_table = Table()
     files_table.add_column("Rank", style="cyan", width=6)
     files_table.add_column("File", style="white")
@@ -134,9 +131,9 @@ def _display_report(report: ComplexityReport):
             f"#{idx}",
             file.file_path,
             f"{file.total_score:.1f}",
-            f"{file.cyclomatic_complexity:.1f}",
-            f"{file.architectural_complexity:.1f}",
-            f"{file.algorithmic_complexity:.1f}"
+            f"{file.cyclomatic_score:.1f}",
+            f"{file.architectural_score:.1f}",
+            f"{file.algorithmic_score:.1f}"
         )
     
     console.print(files_table)
@@ -146,20 +143,18 @@ def _display_report(report: ComplexityReport):
     console.print(f"\n[bold]Most Complex File Analysis:[/bold] {top.file_path}\n")
     console.print(f"[dim]{top.reasoning}[/dim]\n")
     
-    if top.design_patterns:
-        console.print(f"[bold]Design Patterns Detected:[/bold] {', '.join(top.design_patterns)}")
+    if top.patterns_detected:
+        console.print(f"[bold]Design Patterns Detected:[/bold] {', '.join(top.patterns_detected)}")
 
 
 def _save_report(report: ComplexityReport, output_path: str):
     """Save report to JSON file."""
-    import json
     from pathlib import Path
-    
+
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, "w") as f:
-        json.dump(report.model_dump(), f, indent=2)
+
+    output_file.write_bytes(report.to_json_bytes(indent=True))
 
 
 @app.command()
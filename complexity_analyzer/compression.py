@@ -0,0 +1,86 @@
+"""
+Optional LLMLingua-2 prompt compression for file contents.
+"""
+
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPRESSION_MODEL = "microsoft/llmlingua-2-bert-base-multilingual-cased-meetingbank"
+
+# Code-structure tokens that must survive compression so the LLM can
+# still see control flow and declarations
+FORCE_TOKENS = ["def", "class", "if", "else", "for", "while", "return", "import"]
+
+
+class PromptCompressor:
+    """
+    Drops low-self-information tokens from file contents before they
+    reach the LLM, instead of blunt character truncation.
+
+    Wraps LLMLingua-2, which is an optional dependency: install the
+    ``compression`` extra to enable it.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_COMPRESSION_MODEL,
+        device_map: str = "cpu"
+    ):
+        """
+        Initialize the compressor.
+
+        Args:
+            model_name: LLMLingua-2 token-classification model
+            device_map: Device for the compression model ("cpu" or "cuda")
+
+        Raises:
+            ImportError: If the llmlingua package is not installed
+        """
+        try:
+            from llmlingua import PromptCompressor as LLMLinguaCompressor
+        except ImportError as e:
+            raise ImportError(
+                "Prompt compression requires the 'llmlingua' package. "
+                "Install it with: pip install 'ai-complexity-analyzer[compression]'"
+            ) from e
+
+        self._compressor = LLMLinguaCompressor(
+            model_name=model_name,
+            use_llmlingua2=True,
+            device_map=device_map
+        )
+
+    def compress(
+        self,
+        text: str,
+        rate: float = 0.55,
+        force_tokens: Optional[List[str]] = None
+    ) -> str:
+        """
+        Compress text to roughly ``rate`` of its original token count.
+
+        Args:
+            text: Input text (typically source code)
+            rate: Target fraction of tokens to keep (0-1)
+            force_tokens: Tokens that are always preserved
+
+        Returns:
+            Compressed text (original text if compression fails)
+        """
+        try:
+            result = self._compressor.compress_prompt(
+                text,
+                rate=rate,
+                force_tokens=force_tokens or FORCE_TOKENS
+            )
+        except Exception as e:
+            logger.warning(f"Prompt compression failed, using original content: {e}")
+            return text
+
+        compressed = result.get("compressed_prompt", text)
+        logger.debug(
+            f"Compressed {len(text)} -> {len(compressed)} chars (rate={rate})"
+        )
+        return compressed
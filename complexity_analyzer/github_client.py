@@ -2,15 +2,58 @@
 GitHub API client with rate limiting and error handling.
 """
 
+import asyncio
+import fnmatch
+import functools
+import itertools
 import os
 import re
-from typing import Dict, List, Optional
-import requests
+import tarfile
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import httpx
+import orjson
+import requests_cache
+from requests.adapters import HTTPAdapter
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+from urllib3.util.retry import Retry
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+_RETRYABLE_STATUS = {429, 502, 503, 504}
+
+# Supported repository URL shapes, most specific first; precompiled so
+# bulk workflows skip the re-cache lookup per URL
+_REPO_URL_PATTERNS = (
+    re.compile(r"github\.com/([^/]+)/([^/]+?)(?:\.git)?$"),
+    re.compile(r"github\.com/([^/]+)/([^/]+)"),
+)
+
+
+def _is_retryable_http_error(exc: BaseException) -> bool:
+    """Retry transient transport failures and throttling responses."""
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return (
+        isinstance(exc, httpx.HTTPStatusError)
+        and exc.response.status_code in _RETRYABLE_STATUS
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_excludes(patterns: tuple) -> Optional[re.Pattern]:
+    """Compile glob exclude patterns into one alternation regex."""
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
 
 class GitHubAPIClient:
     """
@@ -19,22 +62,94 @@ class GitHubAPIClient:
     """
     
     BASE_URL = "https://api.github.com"
-    
-    def __init__(self, token: Optional[str] = None):
+
+    CODE_EXTENSIONS = frozenset({
+        ".py", ".js", ".ts", ".java", ".cpp", ".c", ".h", ".hpp",
+        ".go", ".rs", ".rb", ".php", ".cs", ".swift", ".kt", ".scala"
+    })
+
+    # One C-level regex match per path instead of 16 endswith checks
+    _CODE_EXT_RE = re.compile(
+        r"\.(?:" + "|".join(sorted(ext.lstrip(".") for ext in CODE_EXTENSIONS)) + r")$"
+    )
+
+    # Below this many files the per-file contents API is cheaper than
+    # downloading a whole snapshot
+    TARBALL_MIN_FILES = 5
+
+    # Persistent HTTP cache shared across runs; 304 revalidations count
+    # as zero against GitHub's rate limit
+    HTTP_CACHE_NAME = ".gh_cache"
+    HTTP_CACHE_TTL = 300
+
+    # In-process memo of decoded file bodies, keyed by URL
+    CONTENT_CACHE_SIZE = 1024
+
+    # Raw media type returns the blob body directly: 33% less on the
+    # wire than the base64-wrapped JSON envelope and no decode pass
+    _RAW_ACCEPT = {"Accept": "application/vnd.github.v3.raw"}
+
+    # Jittered backoff for async fetches; sleeps yield the event loop to
+    # the other in-flight requests instead of blocking the fan-out
+    FETCH_RETRY_ATTEMPTS = 5
+    FETCH_RETRY_WAIT_INITIAL = 1.0
+    FETCH_RETRY_WAIT_MAX = 30.0
+
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        max_connections: int = 20,
+        fetch_concurrency: int = 10
+    ):
         """
         Initialize GitHub client.
-        
+
         Args:
             token: GitHub personal access token (or uses GITHUB_TOKEN env var)
+            max_connections: Connection pool size for concurrent fetches
+            fetch_concurrency: Maximum in-flight file content requests
         """
         self.token = token or os.getenv("GITHUB_TOKEN")
-        self.session = requests.Session()
-        
+        self.max_connections = max_connections
+        self.fetch_concurrency = fetch_concurrency
+
+        # Disk-backed cache makes re-runs on unchanged repos near-free:
+        # fresh entries skip the network entirely, stale ones revalidate
+        # with If-None-Match and a 304 costs no rate limit
+        self.session = requests_cache.CachedSession(
+            self.HTTP_CACHE_NAME,
+            backend="sqlite",
+            expire_after=self.HTTP_CACHE_TTL,
+            cache_control=True
+        )
+
+        # Widen the default pool (10) and retry transient gateway errors
+        # with backoff; tree/contents JSON compresses 5-10x, so ask for
+        # gzip explicitly (requests decompresses transparently)
+        adapter = HTTPAdapter(
+            pool_connections=max_connections,
+            pool_maxsize=max_connections,
+            max_retries=Retry(
+                total=5, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip"})
+
+        # url -> (etag, parsed body) for conditional GET revalidation
+        self._etag_cache: Dict[str, Tuple[str, Dict]] = {}
+
+        # url -> decoded content; blob bodies are immutable for a given
+        # URL within a run, so repeat fetches skip even the disk cache
+        self._content_cache: "OrderedDict[str, str]" = OrderedDict()
+
+        self._headers: Dict[str, str] = {}
         if self.token:
-            self.session.headers.update({
+            self._headers = {
                 "Authorization": f"token {self.token}",
                 "Accept": "application/vnd.github.v3+json"
-            })
+            }
+            self.session.headers.update(self._headers)
     
     def parse_repo_url(self, url: str) -> tuple[str, str]:
         """
@@ -47,16 +162,11 @@ class GitHubAPIClient:
             Tuple of (owner, repo_name)
         """
         # Support various URL formats
-        patterns = [
-            r"github\.com/([^/]+)/([^/]+?)(?:\.git)?$",
-            r"github\.com/([^/]+)/([^/]+)",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
+        for pattern in _REPO_URL_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1), match.group(2).rstrip(".git")
-        
+
         raise ValueError(f"Invalid GitHub URL: {url}")
     
     def fetch_repository_files(
@@ -67,57 +177,232 @@ class GitHubAPIClient:
     ) -> Dict[str, str]:
         """
         Fetch all code files from a repository.
-        
+
+        Synchronous wrapper around :meth:`fetch_repository_files_async`
+        for callers without an event loop.
+
         Args:
             repository_url: GitHub repository URL
             max_files: Maximum number of files to fetch
             exclude_patterns: List of glob patterns to exclude
-            
+
+        Returns:
+            Dictionary mapping file paths to file contents
+        """
+        return asyncio.run(self.fetch_repository_files_async(
+            repository_url,
+            max_files=max_files,
+            exclude_patterns=exclude_patterns
+        ))
+
+    async def fetch_repository_files_async(
+        self,
+        repository_url: str,
+        max_files: int = 50,
+        exclude_patterns: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Fetch all code files from a repository concurrently.
+
+        File contents are pulled over one HTTP/2 connection pool with
+        bounded concurrency, so fetch time stays near-flat in the number
+        of files instead of paying one round-trip each.
+
+        Args:
+            repository_url: GitHub repository URL
+            max_files: Maximum number of files to fetch
+            exclude_patterns: List of glob patterns to exclude
+
         Returns:
             Dictionary mapping file paths to file contents
         """
         owner, repo = self.parse_repo_url(repository_url)
         exclude_patterns = exclude_patterns or []
-        
+
         logger.info(f"Fetching files from {owner}/{repo}")
-        
+
+        if max_files > self.TARBALL_MIN_FILES:
+            # One tarball download replaces N contents-API calls and
+            # skips base64 entirely; fall back to per-file fetches if
+            # the snapshot is unavailable
+            try:
+                return await asyncio.to_thread(
+                    self.fetch_repository_tarball,
+                    owner, repo,
+                    max_files=max_files,
+                    exclude_patterns=exclude_patterns
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Tarball fetch failed for {owner}/{repo}, "
+                    f"falling back to contents API: {e}"
+                )
+
         # Get repository tree
         tree = self._get_repo_tree(owner, repo)
-        
-        # Filter code files
-        code_files = self._filter_code_files(tree, exclude_patterns)
-        
-        # Limit to max_files
-        code_files = code_files[:max_files]
-        
-        # Fetch file contents
+
+        # Filter lazily and stop as soon as max_files paths matched, so
+        # monorepo-sized trees are not scanned past what we need
+        code_files = list(itertools.islice(
+            (
+                item["path"] for item in tree
+                if item["type"] == "blob"
+                and self._is_code_file(item["path"])
+                and not self._should_exclude(item["path"], exclude_patterns)
+            ),
+            max_files
+        ))
+
+        # Fetch file contents concurrently, bounded so we respect
+        # GitHub's secondary rate limits
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        # Keep half the pool warm between bursts so follow-up fetches
+        # reuse TLS sessions instead of re-handshaking
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=max(self.max_connections // 2, 1)
+        )
+
+        async with httpx.AsyncClient(
+            http2=True, headers=self._headers, limits=limits
+        ) as client:
+            async def fetch_one(file_path: str) -> str:
+                async with semaphore:
+                    return await self._get_file_content_async(
+                        client, owner, repo, file_path
+                    )
+
+            results = await asyncio.gather(
+                *(fetch_one(path) for path in code_files),
+                return_exceptions=True
+            )
+
         file_contents = {}
-        for file_path in code_files:
-            try:
-                content = self._get_file_content(owner, repo, file_path)
-                file_contents[file_path] = content
-                logger.debug(f"Fetched {file_path} ({len(content)} bytes)")
-            except Exception as e:
-                logger.warning(f"Failed to fetch {file_path}: {e}")
+        for file_path, result in zip(code_files, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Failed to fetch {file_path}: {result}")
                 continue
-        
+            file_contents[file_path] = result
+            logger.debug(f"Fetched {file_path} ({len(result)} bytes)")
+
         return file_contents
     
+    def fetch_repository_tarball(
+        self,
+        owner: str,
+        repo: str,
+        ref: Optional[str] = None,
+        max_files: int = 50,
+        exclude_patterns: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Fetch code files from a single repository tarball snapshot.
+
+        One API call replaces N per-file contents requests, the payload
+        arrives gzip-compressed and as raw UTF-8 bytes (no base64
+        wrapping), and the download barely touches the rate limit.
+
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            ref: Git ref to snapshot (defaults to the default branch)
+            max_files: Maximum number of files to extract
+            exclude_patterns: List of glob patterns to exclude
+
+        Returns:
+            Dictionary mapping file paths to file contents
+        """
+        exclude_patterns = exclude_patterns or []
+
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/tarball"
+        if ref:
+            url += f"/{ref}"
+
+        # Bypass the HTTP cache here: CachedSession would read the whole
+        # body up front to persist it, defeating stream=True and stuffing
+        # multi-MB snapshots into the sqlite cache
+        with self.session.cache_disabled():
+            response = self.session.get(url, stream=True)
+        response.raise_for_status()
+
+        file_contents: Dict[str, str] = {}
+        try:
+            # Stream-decode members as they arrive ("r|gz") instead of
+            # buffering the whole archive in memory; hitting max_files
+            # abandons the rest of the download
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+
+                    # Strip the "{owner}-{repo}-{sha}/" prefix GitHub adds
+                    path = member.name.split("/", 1)[1] if "/" in member.name else member.name
+
+                    if not self._is_code_file(path):
+                        continue
+                    if self._should_exclude(path, exclude_patterns):
+                        continue
+
+                    extracted = tar.extractfile(member)
+                    if extracted is None:
+                        continue
+
+                    file_contents[path] = extracted.read().decode("utf-8", errors="replace")
+                    if len(file_contents) >= max_files:
+                        break
+        finally:
+            response.close()
+
+        logger.info(f"Extracted {len(file_contents)} files from tarball")
+        return file_contents
+
     def _get_repo_tree(self, owner: str, repo: str) -> List[Dict]:
         """Get repository tree (list of all files)."""
         url = f"{self.BASE_URL}/repos/{owner}/{repo}/git/trees/main?recursive=1"
-        
+
         # Try 'main' branch first, fallback to 'master'
-        response = self.session.get(url)
-        
-        if response.status_code == 404:
+        data = self._get_json_revalidated(url, allow_404=True)
+
+        if data is None:
             url = f"{self.BASE_URL}/repos/{owner}/{repo}/git/trees/master?recursive=1"
-            response = self.session.get(url)
-        
-        response.raise_for_status()
-        data = response.json()
-        
+            data = self._get_json_revalidated(url)
+
         return data.get("tree", [])
+
+    def _get_json_revalidated(
+        self,
+        url: str,
+        allow_404: bool = False
+    ) -> Optional[Dict]:
+        """
+        GET a JSON endpoint with ETag revalidation.
+
+        On an If-None-Match hit GitHub answers 304 without a body (and
+        without charging the rate limit), and the cached parse is
+        returned instead.
+        """
+        headers = {}
+        cached = self._etag_cache.get(url)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        response = self.session.get(url, headers=headers)
+
+        if allow_404 and response.status_code == 404:
+            return None
+        if response.status_code == 304 and cached:
+            return cached[1]
+
+        response.raise_for_status()
+        # Recursive tree payloads run to multiple MB on monorepos;
+        # orjson parses them several times faster than stdlib json
+        data = orjson.loads(response.content)
+
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache[url] = (etag, data)
+
+        return data
     
     def _filter_code_files(
         self,
@@ -125,60 +410,86 @@ class GitHubAPIClient:
         exclude_patterns: List[str]
     ) -> List[str]:
         """Filter tree to only include code files."""
-        code_extensions = {
-            ".py", ".js", ".ts", ".java", ".cpp", ".c", ".h", ".hpp",
-            ".go", ".rs", ".rb", ".php", ".cs", ".swift", ".kt", ".scala"
-        }
-        
-        code_files = []
-        
-        for item in tree:
-            if item["type"] != "blob":
-                continue
-            
-            path = item["path"]
-            
-            # Check extension
-            if not any(path.endswith(ext) for ext in code_extensions):
-                continue
-            
-            # Check exclude patterns
-            if self._should_exclude(path, exclude_patterns):
-                continue
-            
-            code_files.append(path)
-        
-        return code_files
-    
+        # Hoist the compiled regexes and bind their match methods once so
+        # the loop is one extension match and one exclusion match per path,
+        # with no Python-level attribute lookups inside the comprehension
+        is_code = self._CODE_EXT_RE.search
+        exclude_re = _compile_excludes(tuple(exclude_patterns))
+        excluded = exclude_re.match if exclude_re is not None else None
+        return [
+            item["path"] for item in tree
+            if item["type"] == "blob"
+            and is_code(item["path"]) is not None
+            and (excluded is None or excluded(item["path"]) is None)
+        ]
+
+    def _is_code_file(self, path: str) -> bool:
+        """Check if path has a recognized code extension."""
+        return self._CODE_EXT_RE.search(path) is not None
+
     def _should_exclude(self, path: str, patterns: List[str]) -> bool:
         """Check if path matches any exclude pattern."""
-        from fnmatch import fnmatch
-        
-        for pattern in patterns:
-            if fnmatch(path, pattern):
-                return True
-        
-        return False
+        exclude_re = _compile_excludes(tuple(patterns))
+        return exclude_re is not None and exclude_re.match(path) is not None
     
+    def _remember_content(self, url: str, content: str) -> None:
+        """Memoize decoded content, evicting the least recently used."""
+        self._content_cache[url] = content
+        if len(self._content_cache) > self.CONTENT_CACHE_SIZE:
+            self._content_cache.popitem(last=False)
+
     def _get_file_content(self, owner: str, repo: str, file_path: str) -> str:
         """Get content of a specific file."""
         url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{file_path}"
-        
-        response = self.session.get(url)
+
+        cached = self._content_cache.get(url)
+        if cached is not None:
+            self._content_cache.move_to_end(url)
+            return cached
+
+        response = self.session.get(url, headers=self._RAW_ACCEPT)
         response.raise_for_status()
-        
-        data = response.json()
-        
-        # Decode base64 content
-        import base64
-        content = base64.b64decode(data["content"]).decode("utf-8")
-        
+
+        content = response.text
+        self._remember_content(url, content)
         return content
-    
+
+    async def _get_file_content_async(
+        self,
+        client: httpx.AsyncClient,
+        owner: str,
+        repo: str,
+        file_path: str
+    ) -> str:
+        """Get content of a specific file over the shared async client."""
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/{file_path}"
+
+        cached = self._content_cache.get(url)
+        if cached is not None:
+            self._content_cache.move_to_end(url)
+            return cached
+
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.FETCH_RETRY_ATTEMPTS),
+            wait=wait_exponential_jitter(
+                initial=self.FETCH_RETRY_WAIT_INITIAL,
+                max=self.FETCH_RETRY_WAIT_MAX
+            ),
+            retry=retry_if_exception(_is_retryable_http_error),
+            reraise=True
+        ):
+            with attempt:
+                response = await client.get(url, headers=self._RAW_ACCEPT)
+                response.raise_for_status()
+
+        content = response.text
+        self._remember_content(url, content)
+        return content
+
     def get_rate_limit(self) -> Dict:
         """Check current API rate limit status."""
         url = f"{self.BASE_URL}/rate_limit"
         response = self.session.get(url)
         response.raise_for_status()
-        
-        return response.json()
+
+        return orjson.loads(response.content)
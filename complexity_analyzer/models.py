@@ -2,8 +2,15 @@
 Data models for complexity analysis using Pydantic for validation.
 """
 
-from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field, validator
+import heapq
+from collections import Counter
+from functools import cached_property
+from itertools import chain
+from typing import List, Dict, Optional, Tuple, Any
+
+import numpy as np
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
 from enum import Enum
 
 
@@ -17,7 +24,11 @@ class ComplexityCategory(str, Enum):
 
 class FileComplexity(BaseModel):
     """Complexity analysis for a single file."""
-    
+
+    # frozen instances are hashable, which the caching layer relies on;
+    # it also keeps validation on pydantic-core's fast path
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
     file_path: str = Field(..., description="Relative path to file in repository")
     total_score: float = Field(..., ge=0, le=100, description="Overall complexity score (0-100)")
     
@@ -29,16 +40,20 @@ class FileComplexity(BaseModel):
     function_count: int = Field(..., ge=0)
     class_count: int = Field(..., ge=0)
     
-    patterns_detected: List[str] = Field(default_factory=list)
+    # tuple keeps frozen instances actually hashable and lets the common
+    # no-patterns case share the empty-tuple singleton instead of a
+    # per-instance list
+    patterns_detected: Tuple[str, ...] = ()
     reasoning: str = Field(..., min_length=10)
     
-    @validator('total_score')
-    def validate_total_score(cls, v: float, values: Dict) -> float:
+    @field_validator('total_score')
+    @classmethod
+    def validate_total_score(cls, v: float, info: ValidationInfo) -> float:
         """Ensure total score is reasonable given component scores."""
-        if 'cyclomatic_score' in values and 'architectural_score' in values:
+        if 'cyclomatic_score' in info.data and 'architectural_score' in info.data:
             # Basic sanity check - total should be in range of components
-            min_score = min(values.get('cyclomatic_score', 0), 
-                          values.get('architectural_score', 0))
+            min_score = min(info.data.get('cyclomatic_score', 0),
+                            info.data.get('architectural_score', 0))
             if v < min_score - 20:  # Allow some variance
                 raise ValueError("Total score significantly below component scores")
         return v
@@ -55,27 +70,70 @@ class ComplexityReport(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     timestamp: str
     
-    @validator('top_file')
-    def validate_top_file(cls, v: str, values: Dict) -> str:
+    @field_validator('top_file')
+    @classmethod
+    def validate_top_file(cls, v: str, info: ValidationInfo) -> str:
         """Ensure top_file exists in analyzed_files."""
-        if 'analyzed_files' in values:
-            file_paths = [f.file_path for f in values['analyzed_files']]
+        if 'analyzed_files' in info.data:
+            file_paths = [f.file_path for f in info.data['analyzed_files']]
             if v not in file_paths:
                 raise ValueError(f"Top file {v} not found in analyzed files")
         return v
     
-    def get_files_by_complexity(self, threshold: float = 70.0) -> List[FileComplexity]:
-        """Return files exceeding complexity threshold."""
-        return sorted(
-            [f for f in self.analyzed_files if f.total_score >= threshold],
-            key=lambda x: x.total_score,
-            reverse=True
+    @cached_property
+    def _scores(self) -> np.ndarray:
+        """Total scores as a float32 vector (column view for aggregation)."""
+        return np.fromiter(
+            (f.total_score for f in self.analyzed_files),
+            dtype=np.float32,
+            count=len(self.analyzed_files)
         )
+
+    def top_k(self, k: int) -> List[FileComplexity]:
+        """
+        Top k files by total score, most complex first.
+
+        np.argpartition selects the winners in O(N) and only those k get
+        sorted, so large reports skip a full Python-level sort.
+        """
+        n = len(self.analyzed_files)
+        if n == 0 or k <= 0:
+            return []
+        k = min(k, n)
+
+        if k == n:
+            idx = np.argsort(-self._scores)
+        else:
+            idx = np.argpartition(-self._scores, k - 1)[:k]
+            idx = idx[np.argsort(-self._scores[idx])]
+        return [self.analyzed_files[i] for i in idx]
+
+    def to_json_bytes(self, indent: bool = False) -> bytes:
+        """Serialize the report with orjson straight to bytes."""
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(self.model_dump(mode="json"), option=option)
+
+    def get_files_by_complexity(
+        self,
+        threshold: float = 70.0,
+        limit: Optional[int] = None
+    ) -> List[FileComplexity]:
+        """Return files exceeding complexity threshold, most complex first.
+
+        With ``limit`` set, a heap-based partial sort picks the top
+        entries in O(N log limit) instead of sorting every match.
+        """
+        matches = (f for f in self.analyzed_files if f.total_score >= threshold)
+        if limit is not None:
+            return heapq.nlargest(limit, matches, key=lambda x: x.total_score)
+        return sorted(matches, key=lambda x: x.total_score, reverse=True)
     
     def get_pattern_distribution(self) -> Dict[str, int]:
         """Count occurrences of each design pattern across all files."""
-        pattern_counts: Dict[str, int] = {}
-        for file in self.analyzed_files:
-            for pattern in file.patterns_detected:
-                pattern_counts[pattern] = pattern_counts.get(pattern, 0) + 1
-        return dict(sorted(pattern_counts.items(), key=lambda x: x[1], reverse=True))
+        # Counter + chain keep the counting loop in C instead of
+        # per-pattern dict.get calls, and most_common replaces the
+        # Python-keyed sort
+        counts = Counter(
+            chain.from_iterable(f.patterns_detected for f in self.analyzed_files)
+        )
+        return dict(counts.most_common())
@@ -2,7 +2,9 @@
 Token management for LLM API calls with cost tracking.
 """
 
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+import os
 import tiktoken
 import logging
 
@@ -36,12 +38,18 @@ class TokenManager:
     def __init__(self, model: str = "gpt-4-turbo-preview"):
         """Initialize token manager for specific model."""
         self.model = model
-        self.encoding = self._get_encoding(model)
         self.total_input_tokens = 0
         self.total_output_tokens = 0
-    
-    def _get_encoding(self, model: str) -> tiktoken.Encoding:
-        """Get appropriate encoding for model."""
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        """Encoding for this model (loaded lazily, shared across instances)."""
+        return self._encoding_for(self.model)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _encoding_for(model: str) -> tiktoken.Encoding:
+        """Get appropriate encoding for model, memoized process-wide."""
         if "gpt" in model:
             try:
                 return tiktoken.encoding_for_model(model)
@@ -50,11 +58,52 @@ class TokenManager:
         else:
             # Anthropic uses similar tokenization to GPT-4
             return tiktoken.get_encoding("cl100k_base")
-    
+
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
         return len(self.encoding.encode(text))
-    
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _encode_static(model: str, text: str) -> Tuple[int, ...]:
+        """Token IDs for a static text, memoized per (model, text)."""
+        return tuple(TokenManager._encoding_for(model).encode(text))
+
+    def encode_cached(self, text: str) -> Tuple[int, ...]:
+        """
+        Encode a static prompt once per process and reuse the token IDs.
+
+        System prompts and format instructions are identical across every
+        per-file call; re-running the BPE merges on them each time is
+        pure waste. Only use for prompts with few distinct values — the
+        memo is keyed on the full text.
+        """
+        return self._encode_static(self.model, text)
+
+    def count_prefixed(self, text: str, cached_prefix_tokens: Sequence[int]) -> int:
+        """
+        Count tokens for a prompt built from a static prefix plus text.
+
+        The prefix arrives pre-encoded (see :meth:`encode_cached`), so
+        only the variable part pays for tokenization.
+        """
+        return len(cached_prefix_tokens) + self.count_tokens(text)
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens for many texts at once.
+
+        Uses tiktoken's native encode_batch, which releases the GIL and
+        tokenizes across threads — much faster than N separate encode
+        calls.
+        """
+        return [
+            len(tokens)
+            for tokens in self.encoding.encode_batch(
+                texts, num_threads=os.cpu_count() or 1
+            )
+        ]
+
     def truncate_to_limit(
         self,
         text: str,
@@ -74,12 +123,17 @@ class TokenManager:
         """
         max_tokens = max_tokens or self.MODEL_LIMITS.get(self.model, 8000)
         max_tokens -= buffer
-        
+
+        # A BPE token is at least one character, so texts with no more
+        # characters than the budget can never exceed it — skip encoding
+        if len(text) <= max_tokens:
+            return text
+
         tokens = self.encoding.encode(text)
-        
+
         if len(tokens) <= max_tokens:
             return text
-        
+
         truncated_tokens = tokens[:max_tokens]
         return self.encoding.decode(truncated_tokens)
     
@@ -0,0 +1,75 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import copy
+import os
+from collections import OrderedDict
+
+import pytest
+
+# Provider construction requires keys to be present; tests never make
+# real API calls
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+from complexity_analyzer.analyzer import AnthropicProvider, OpenAIProvider  # noqa: E402
+from complexity_analyzer.github_client import GitHubAPIClient  # noqa: E402
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--runslow", action="store_true", default=False,
+        help="also run tests marked slow"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(scope="session")
+def gh_client_template(tmp_path_factory):
+    """One GitHubAPIClient per session, its HTTP cache isolated under tmp."""
+    cache_name = str(tmp_path_factory.mktemp("http_cache") / "gh_cache")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(GitHubAPIClient, "HTTP_CACHE_NAME", cache_name)
+        yield GitHubAPIClient()
+
+
+@pytest.fixture
+def gh_client(gh_client_template):
+    """Per-test shallow copy of the session client, with fresh caches."""
+    client = copy.copy(gh_client_template)
+    client._etag_cache = {}
+    client._content_cache = OrderedDict()
+    return client
+
+
+@pytest.fixture(scope="session")
+def openai_provider_template():
+    """One OpenAIProvider per session; init builds chains eagerly."""
+    return OpenAIProvider()
+
+
+@pytest.fixture
+def openai_provider(openai_provider_template):
+    """Per-test shallow copy of the session provider."""
+    return copy.copy(openai_provider_template)
+
+
+@pytest.fixture(scope="session")
+def anthropic_provider_template():
+    """One AnthropicProvider per session; init builds chains eagerly."""
+    return AnthropicProvider()
+
+
+@pytest.fixture
+def anthropic_provider(anthropic_provider_template):
+    """Per-test shallow copy of the session provider."""
+    return copy.copy(anthropic_provider_template)
@@ -0,0 +1,63 @@
+"""
+Unit tests for the analysis result cache.
+"""
+
+import time
+
+import pytest
+from complexity_analyzer.cache import AnalysisCache
+
+
+class TestAnalysisCache:
+    """Test suite for AnalysisCache."""
+
+    def test_make_key_is_deterministic(self):
+        """Test identical inputs produce identical keys."""
+        key1 = AnalysisCache.make_key("gpt-4", 0.1, "print('hello')")
+        key2 = AnalysisCache.make_key("gpt-4", 0.1, "print('hello')")
+
+        assert key1 == key2
+
+    def test_make_key_varies_with_inputs(self):
+        """Test key changes when model, temperature or content change."""
+        base = AnalysisCache.make_key("gpt-4", 0.1, "print('hello')")
+
+        assert AnalysisCache.make_key("gpt-3.5-turbo", 0.1, "print('hello')") != base
+        assert AnalysisCache.make_key("gpt-4", 0.5, "print('hello')") != base
+        assert AnalysisCache.make_key("gpt-4", 0.1, "print('bye')") != base
+
+    def test_set_get_roundtrip(self):
+        """Test stored values can be retrieved."""
+        cache = AnalysisCache(path=":memory:")
+
+        cache.set("key1", '{"score": 42}')
+
+        assert cache.get("key1") == '{"score": 42}'
+        assert cache.get("missing") is None
+
+    def test_expired_entries_are_evicted(self):
+        """Test entries past their TTL are treated as misses."""
+        cache = AnalysisCache(path=":memory:", ttl=0.01)
+        cache.set("key1", "value")
+        # Drop the in-memory tier so the TTL check on SQLite applies
+        cache._memory.clear()
+
+        time.sleep(0.02)
+
+        assert cache.get("key1") is None
+
+    def test_memory_tier_evicts_oldest(self):
+        """Test the in-process LRU respects its size bound."""
+        cache = AnalysisCache(path=":memory:", memory_size=2)
+
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.set("c", "3")
+
+        assert "a" not in cache._memory
+        # Evicted from memory but still served from SQLite
+        assert cache.get("a") == "1"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
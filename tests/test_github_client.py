@@ -2,62 +2,55 @@
 Unit tests for GitHub API client.
 """
 
+import json
+
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from complexity_analyzer.github_client import GitHubAPIClient
 
 
 class TestGitHubAPIClient:
     """Test suite for GitHubAPIClient."""
     
-    def test_parse_repo_url_https(self):
+    def test_parse_repo_url_https(self, gh_client):
         """Test parsing HTTPS GitHub URLs."""
-        client = GitHubAPIClient()
-        
-        owner, repo = client.parse_repo_url("https://github.com/owner/repo")
+        owner, repo = gh_client.parse_repo_url("https://github.com/owner/repo")
         assert owner == "owner"
         assert repo == "repo"
     
-    def test_parse_repo_url_git(self):
+    def test_parse_repo_url_git(self, gh_client):
         """Test parsing .git URLs."""
-        client = GitHubAPIClient()
-        
-        owner, repo = client.parse_repo_url("https://github.com/owner/repo.git")
+        owner, repo = gh_client.parse_repo_url("https://github.com/owner/repo.git")
         assert owner == "owner"
         assert repo == "repo"
     
-    def test_parse_repo_url_invalid(self):
+    def test_parse_repo_url_invalid(self, gh_client):
         """Test parsing invalid URLs raises error."""
-        client = GitHubAPIClient()
-        
         with pytest.raises(ValueError, match="Invalid GitHub URL"):
-            client.parse_repo_url("https://example.com/invalid")
+            gh_client.parse_repo_url("https://example.com/invalid")
     
-    @patch('requests.Session.get')
-    def test_get_repo_tree(self, mock_get):
+    @patch('requests_cache.CachedSession.get')
+    def test_get_repo_tree(self, mock_get, gh_client):
         """Test fetching repository tree."""
-        client = GitHubAPIClient()
-        
-        # Mock response
+        # Mock response (parsed from raw bytes via orjson)
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "tree": [
                 {"type": "blob", "path": "test.py"},
                 {"type": "tree", "path": "src"}
             ]
-        }
+        }).encode()
+        mock_response.headers = {}
         mock_get.return_value = mock_response
         
-        tree = client._get_repo_tree("owner", "repo")
+        tree = gh_client._get_repo_tree("owner", "repo")
         
         assert len(tree) == 2
         assert tree[0]["path"] == "test.py"
     
-    def test_filter_code_files(self):
+    def test_filter_code_files(self, gh_client):
         """Test filtering code files from tree."""
-        client = GitHubAPIClient()
-        
         tree = [
             {"type": "blob", "path": "src/main.py"},
             {"type": "blob", "path": "README.md"},
@@ -65,7 +58,7 @@ class TestGitHubAPIClient:
             {"type": "tree", "path": "docs"}
         ]
         
-        code_files = client._filter_code_files(
+        code_files = gh_client._filter_code_files(
             tree,
             exclude_patterns=["tests/*", "*.md"]
         )
@@ -73,33 +66,110 @@ class TestGitHubAPIClient:
         assert len(code_files) == 1
         assert "src/main.py" in code_files
     
-    def test_should_exclude(self):
+    def test_should_exclude(self, gh_client):
         """Test exclude pattern matching."""
-        client = GitHubAPIClient()
-        
-        assert client._should_exclude("tests/test.py", ["tests/*"]) is True
-        assert client._should_exclude("src/main.py", ["tests/*"]) is False
-        assert client._should_exclude("README.md", ["*.md"]) is True
+        assert gh_client._should_exclude("tests/test.py", ["tests/*"]) is True
+        assert gh_client._should_exclude("src/main.py", ["tests/*"]) is False
+        assert gh_client._should_exclude("README.md", ["*.md"]) is True
     
-    @patch('requests.Session.get')
-    def test_get_file_content(self, mock_get):
-        """Test fetching file content."""
-        import base64
-        
-        client = GitHubAPIClient()
-        
-        # Mock response
+    @patch('requests_cache.CachedSession.get')
+    def test_get_file_content(self, mock_get, gh_client):
+        """Test fetching file content via the raw media type."""
+        # Mock raw response (no base64 envelope)
         content = "print('hello world')"
-        encoded = base64.b64encode(content.encode()).decode()
-        
+
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"content": encoded}
+        mock_response.text = content
         mock_get.return_value = mock_response
-        
-        result = client._get_file_content("owner", "repo", "test.py")
-        
+
+        result = gh_client._get_file_content("owner", "repo", "test.py")
+
         assert result == content
+        assert mock_get.call_args.kwargs["headers"]["Accept"] == "application/vnd.github.v3.raw"
+
+    @patch('requests_cache.CachedSession.get')
+    def test_get_file_content_memoized(self, mock_get, gh_client):
+        """Test repeat fetches of the same file skip the network."""
+        content = "print('hello world')"
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.text = content
+        mock_get.return_value = mock_response
+
+        first = gh_client._get_file_content("owner", "repo", "test.py")
+        second = gh_client._get_file_content("owner", "repo", "test.py")
+
+        assert first == second == content
+        assert mock_get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_repository_files_async_fans_out(self, gh_client):
+        """Test the async path dispatches one bounded fetch per code file."""
+        tree = [{"type": "blob", "path": f"src/file{i}.py"} for i in range(3)]
+
+        with patch.object(GitHubAPIClient, "_get_repo_tree", return_value=tree), \
+             patch.object(
+                 GitHubAPIClient, "_get_file_content_async",
+                 new=AsyncMock(return_value="print('x')")
+             ) as mock_fetch:
+            files = await gh_client.fetch_repository_files_async(
+                "https://github.com/owner/repo", max_files=5
+            )
+
+        assert len(files) == 3
+        assert mock_fetch.await_count == 3
+
+    @patch('requests_cache.CachedSession.get')
+    def test_fetch_repository_tarball(self, mock_get, gh_client):
+        """Test tarball extraction strips prefixes and applies filters."""
+        import io
+        import tarfile
+
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+            for name, body in [
+                ("owner-repo-abc123/src/main.py", "print('hi')"),
+                ("owner-repo-abc123/README.md", "# readme"),
+                ("owner-repo-abc123/tests/test_main.py", "print('t')"),
+            ]:
+                data = body.encode()
+                info = tarfile.TarInfo(name=name)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.raw = io.BytesIO(buf.getvalue())
+        mock_get.return_value = mock_response
+
+        files = gh_client.fetch_repository_tarball(
+            "owner", "repo", exclude_patterns=["tests/*"]
+        )
+
+        assert files == {"src/main.py": "print('hi')"}
+
+    @pytest.mark.asyncio
+    async def test_get_file_content_async_retries_on_429(self, gh_client):
+        """Test throttled fetches back off and succeed on a later attempt."""
+        import httpx
+
+        request = httpx.Request("GET", "https://api.github.com/x")
+        rate_limited = httpx.Response(429, request=request)
+        ok = httpx.Response(200, text="print('x')", request=request)
+
+        mock_client = Mock()
+        mock_client.get = AsyncMock(side_effect=[rate_limited, rate_limited, ok])
+        gh_client.FETCH_RETRY_WAIT_INITIAL = 0.0
+        gh_client.FETCH_RETRY_WAIT_MAX = 0.0
+
+        content = await gh_client._get_file_content_async(
+            mock_client, "owner", "repo", "test.py"
+        )
+
+        assert content == "print('x')"
+        assert mock_client.get.await_count == 3
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""
+Unit tests for the static prefilter.
+"""
+
+import pytest
+from complexity_analyzer.prefilter import (
+    inspect_file,
+    build_trivial_stub,
+    PrefilterStats
+)
+
+COMPLEX_SOURCE = "\n".join(
+    [
+        "class Dispatcher:",
+        "    def dispatch(self, items):",
+        "        for item in items:",
+        "            if item.ready and not item.stale:",
+        "                while item.pending:",
+        "                    item.step()",
+        "            elif item.stale:",
+        "                item.reset()",
+        "        return items",
+    ]
+    * 4
+)
+
+
+class TestPrefilter:
+    """Test suite for the AST-based prefilter."""
+
+    def test_trivial_python_file(self):
+        """Test tiny straight-line files are flagged trivial."""
+        stats = inspect_file("pkg/__init__.py", "from .core import main\n")
+
+        assert stats.is_trivial is True
+        assert stats.cyclomatic == 1
+
+    def test_complex_python_file(self):
+        """Test branching code escapes the prefilter."""
+        stats = inspect_file("src/dispatcher.py", COMPLEX_SOURCE)
+
+        assert stats.is_trivial is False
+        assert stats.cyclomatic > 3
+        assert stats.function_count == 4
+        assert stats.class_count == 4
+
+    def test_unparseable_file_escalates(self):
+        """Test syntax errors always go to the LLM."""
+        stats = inspect_file("broken.py", "def oops(:\n")
+
+        assert stats.is_trivial is False
+
+    def test_non_python_uses_line_heuristic(self):
+        """Test non-Python files fall back to line counting."""
+        assert inspect_file("tiny.go", "package main\n").is_trivial is True
+        assert inspect_file("big.go", "x\n" * 100).is_trivial is False
+
+    def test_trivial_stub_is_valid(self):
+        """Test stubs satisfy the FileComplexity model."""
+        stats = PrefilterStats(
+            line_count=3, cyclomatic=1, function_count=0,
+            class_count=0, is_trivial=True
+        )
+
+        stub = build_trivial_stub("pkg/__init__.py", stats)
+
+        assert stub.file_path == "pkg/__init__.py"
+        assert stub.total_score == 5.0
+        assert "prefilter" in stub.reasoning
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,104 @@
+"""
+Unit tests for token counting and cost estimation.
+"""
+
+import pytest
+from unittest.mock import patch
+from complexity_analyzer.token_manager import TokenManager
+
+
+class FakeEncoding:
+    """Word-level stand-in for a tiktoken encoding (no network needed)."""
+
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+    def encode_batch(self, texts, num_threads=1):
+        return [self.encode(text) for text in texts]
+
+
+@pytest.fixture
+def manager():
+    """TokenManager backed by the fake encoding."""
+    fake = staticmethod(lambda model: FakeEncoding())
+    with patch.object(TokenManager, "_encoding_for", fake):
+        yield TokenManager(model="gpt-4")
+
+
+class TestTokenManager:
+    """Test suite for TokenManager."""
+
+    def test_initialization_does_not_load_encoding(self):
+        """Test the encoding is loaded lazily, not at construction."""
+        with patch.object(TokenManager, "_encoding_for") as mock_encoding:
+            TokenManager(model="gpt-4")
+            mock_encoding.assert_not_called()
+
+    def test_count_tokens(self, manager):
+        """Test single-text token counting."""
+        assert manager.count_tokens("one two three") == 3
+
+    def test_count_tokens_batch(self, manager):
+        """Test batch token counting matches per-text counts."""
+        counts = manager.count_tokens_batch(["one", "one two", "one two three"])
+
+        assert counts == [1, 2, 3]
+
+    def test_truncate_short_text_skips_encoding(self, manager):
+        """Test texts under the character budget are returned untouched."""
+        text = "short text"
+
+        assert manager.truncate_to_limit(text, max_tokens=100, buffer=0) is text
+
+    def test_truncate_long_text(self, manager):
+        """Test over-budget texts are cut at the token boundary."""
+        text = " ".join(f"word{i}" for i in range(50))
+
+        truncated = manager.truncate_to_limit(text, max_tokens=10, buffer=0)
+
+        assert truncated == " ".join(f"word{i}" for i in range(10))
+
+    def test_encode_cached_encodes_once(self, manager):
+        """Test static prompts are encoded a single time per process."""
+        with patch.object(
+            FakeEncoding, "encode", side_effect=FakeEncoding.encode, autospec=True
+        ) as mock_encode:
+            first = manager.encode_cached("static system prompt")
+            second = manager.encode_cached("static system prompt")
+
+        assert first == second == ("static", "system", "prompt")
+        assert mock_encode.call_count == 1
+
+    def test_count_prefixed_only_encodes_delta(self, manager):
+        """Test prefixed counting adds the cached prefix length."""
+        prefix = manager.encode_cached("a static prefix")
+
+        assert manager.count_prefixed("one two", prefix) == 5
+
+    def test_estimate_cost(self):
+        """Test cost estimation uses per-model pricing."""
+        manager = TokenManager(model="gpt-4")
+
+        cost = manager.estimate_cost(input_tokens=1000, output_tokens=1000)
+
+        assert cost == pytest.approx(0.03 + 0.06)
+
+    def test_track_usage_accumulates(self):
+        """Test usage tracking sums across calls and resets."""
+        manager = TokenManager(model="gpt-4")
+
+        manager.track_usage(100, 50)
+        manager.track_usage(200, 100)
+
+        assert manager.total_input_tokens == 300
+        assert manager.total_output_tokens == 150
+
+        manager.reset()
+        assert manager.total_input_tokens == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])